@@ -3,32 +3,53 @@
 Google Sheets API pour accéder aux menus privés
 """
 
+import calendar
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
-# Import global de gspread pour les exceptions
-try:
-    import gspread
-    from google.oauth2.service_account import Credentials
-    GSPREAD_AVAILABLE = True
-except ImportError:
-    GSPREAD_AVAILABLE = False
-    print("❌ Bibliothèques manquantes. Installez avec:")
-    print("pip3 install gspread google-auth --break-system-packages")
+# gspread et numpy sont importés paresseusement dans setup_connection:
+# leur chargement coûte ~200-300 ms et ne sert à rien pour --help
+# ou une erreur de credentials
+
+# Noms des mois SANS accents (comme dans les onglets)
+MONTH_NAMES_FR = (None, "Janvier", "Fevrier", "Mars", "Avril", "Mai", "Juin",
+                  "Juillet", "Aout", "Septembre", "Octobre", "Novembre", "Decembre")
+
+def _pad_rows(values):
+    """Uniformise la largeur des lignes (l'API tronque les vides en fin)"""
+    ncols = max((len(row) for row in values), default=0)
+    return [row + [''] * (ncols - len(row)) for row in values]
+
+
+# Cache disque du jeton d'accès OAuth (valide ~60 min), pour éviter
+# l'échange d'authentification (~500 ms) à chaque rafraîchissement
+TOKEN_CACHE_FILE = os.path.expanduser('~/.cache/home_dashboard/gspread_token.json')
 
 class GoogleSheetsMenuParser:
     def __init__(self, credentials_file, spreadsheet_id):
         self.credentials_file = credentials_file
         self.spreadsheet_id = spreadsheet_id
         self.gc = None
-        
+        self._spreadsheet = None
+        self._worksheets_by_title = None
+        self._values_cache = {}
+
     def setup_connection(self):
         """Établit la connexion avec Google Sheets"""
-        if not GSPREAD_AVAILABLE:
+        # Import différé des bibliothèques lourdes (globales car gspread et
+        # numpy servent aussi aux autres méthodes)
+        global gspread, np
+        try:
+            import gspread
+            import numpy as np
+            from google.oauth2.service_account import Credentials
+        except ImportError:
             print("❌ Bibliothèques manquantes. Installez avec:")
-            print("pip3 install gspread google-auth --break-system-packages")
+            print("pip3 install gspread google-auth numpy --break-system-packages")
             return False
-            
+
         try:
             # Vérifier que le fichier de credentials existe
             if not os.path.exists(self.credentials_file):
@@ -41,34 +62,87 @@ class GoogleSheetsMenuParser:
                 # PAS de drive.readonly - pas nécessaire si on partage le sheet
             ]
             
-            # Authentification
-            credentials = Credentials.from_service_account_file(
-                self.credentials_file, scopes=SCOPES
-            )
+            # Authentification: réutiliser un jeton encore valide si possible
+            credentials = self._load_cached_token(SCOPES)
+            if credentials is None:
+                credentials = Credentials.from_service_account_file(
+                    self.credentials_file, scopes=SCOPES
+                )
+                try:
+                    # Obtenir le jeton tout de suite pour pouvoir le mettre
+                    # en cache pour les prochains rafraîchissements
+                    from google.auth.transport.requests import Request
+                    credentials.refresh(Request())
+                    self._save_token(credentials)
+                except Exception:
+                    pass  # l'autorisation se fera au premier appel API
+
             self.gc = gspread.authorize(credentials)
-            
+
             return True
             
         except Exception as e:
             print(f"❌ Erreur connexion Google Sheets: {e}")
             return False
     
+    def _load_cached_token(self, scopes):
+        """Recharge un jeton d'accès encore valide depuis le cache disque"""
+        try:
+            with open(TOKEN_CACHE_FILE) as f:
+                cached = json.load(f)
+
+            # Marge de 5 min pour ne pas partir avec un jeton presque expiré
+            expiry = datetime.fromisoformat(cached['expiry'])
+            if datetime.utcnow() >= expiry - timedelta(minutes=5):
+                return None
+
+            from google.oauth2.credentials import Credentials as TokenCredentials
+            credentials = TokenCredentials(token=cached['token'], scopes=scopes)
+            credentials.expiry = expiry
+            return credentials
+        except Exception:
+            return None
+
+    def _save_token(self, credentials):
+        """Sauvegarde le jeton d'accès pour les prochains rafraîchissements"""
+        try:
+            if not credentials.token or not credentials.expiry:
+                return
+            os.makedirs(os.path.dirname(TOKEN_CACHE_FILE), exist_ok=True)
+            with open(TOKEN_CACHE_FILE, 'w') as f:
+                json.dump({
+                    'token': credentials.token,
+                    'expiry': credentials.expiry.isoformat()
+                }, f)
+        except Exception:
+            pass  # le cache est une optimisation, jamais bloquant
+
+    def _get_spreadsheet(self):
+        """Ouvre le spreadsheet une seule fois et le mémorise"""
+        if self._spreadsheet is None:
+            self._spreadsheet = self.gc.open_by_key(self.spreadsheet_id)
+        return self._spreadsheet
+
+    def _get_worksheets_by_title(self):
+        """Liste les onglets une seule fois et les indexe par titre"""
+        if self._worksheets_by_title is None:
+            self._worksheets_by_title = {
+                w.title: w for w in self._get_spreadsheet().worksheets()
+            }
+        return self._worksheets_by_title
+
+    def _get_values(self, worksheet):
+        """Cache les valeurs d'un onglet pour éviter les appels API répétés"""
+        if worksheet.id not in self._values_cache:
+            self._values_cache[worksheet.id] = worksheet.get_all_values()
+        return self._values_cache[worksheet.id]
+
     def determine_sheet_for_date(self, target_date):
         """
         Détermine l'onglet à utiliser pour une date donnée.
         Logique simple: les onglets sont toujours pour l'année en cours.
         On cherche dans le mois de la date, puis les mois adjacents.
         """
-        # Noms des mois SANS accents (comme dans tes onglets)
-        month_names = {
-            1: "Janvier", 2: "Fevrier", 3: "Mars", 4: "Avril",
-            5: "Mai", 6: "Juin", 7: "Juillet", 8: "Aout", 
-            9: "Septembre", 10: "Octobre", 11: "Novembre", 12: "Decembre"
-        }
-        
-        # Ouvrir le spreadsheet
-        spreadsheet = self.gc.open_by_key(self.spreadsheet_id)
-        
         # Mois à tester (mois de la date cible et mois adjacents)
         target_month = target_date.month
         
@@ -84,58 +158,39 @@ class GoogleSheetsMenuParser:
             months_to_check.insert(0, prev_month)
         
         # Si on est dans les 7 derniers jours du mois, vérifier aussi le mois suivant
-        # Calculer le nombre de jours dans le mois
-        if target_month == 12:
-            days_in_month = 31
-            next_month = 1
-        else:
-            next_month_date = datetime(target_date.year, target_month + 1, 1)
-            days_in_month = (next_month_date - timedelta(days=1)).day
-            next_month = target_month + 1
-            
+        next_month = 1 if target_month == 12 else target_month + 1
+        days_in_month = calendar.monthrange(target_date.year, target_month)[1]
+
         if target_date.day >= days_in_month - 7:
             months_to_check.append(next_month)
         
-        # Tester chaque mois
-        for month_num in months_to_check:
-            month_name = month_names[month_num]
-            try:
-                worksheet = spreadsheet.worksheet(month_name)
-                
-                # Vérifier si cette date existe dans cet onglet
-                if self.date_exists_in_sheet(worksheet, target_date):
-                    return worksheet
-                    
-            except gspread.exceptions.WorksheetNotFound:
-                continue
-            except Exception as e:
-                continue
-        
+        # Tester chaque mois (onglets indexés par titre, un seul appel API)
         try:
-            spreadsheet = self.gc.open_by_key(self.spreadsheet_id)
-            worksheets = spreadsheet.worksheets()
+            worksheets_by_title = self._get_worksheets_by_title()
         except Exception as e:
             print(f"❌ Impossible de lister les onglets: {e}")
-        
+            return None
+
+        for month_num in months_to_check:
+            worksheet = worksheets_by_title.get(MONTH_NAMES_FR[month_num])
+            if worksheet is None:
+                continue
+
+            # Vérifier si cette date existe dans cet onglet
+            if self.date_exists_in_sheet(worksheet, target_date):
+                return worksheet
+
         return None
     
     def date_exists_in_sheet(self, worksheet, target_date):
         """Vérifie si une date spécifique existe dans un onglet"""
         try:
-            all_values = worksheet.get_all_values()
-            target_date_str = target_date.strftime('%d/%m')
-            
-            # Parcourir toutes les cellules pour chercher la date
-            for row in all_values:
-                for cell in row:
-                    if cell and ' ' in cell:
-                        # Format "lundi 30/06"
-                        parts = cell.strip().split(' ')
-                        if len(parts) >= 2:
-                            date_part = parts[-1]
-                            if date_part == target_date_str:
-                                return True
-            return False
+            all_values = self._get_values(worksheet)
+
+            # Format "lundi 30/06": une recherche de sous-chaîne suffit,
+            # avec arrêt dès la première cellule qui correspond
+            needle = ' ' + target_date.strftime('%d/%m')
+            return any(needle in cell for row in all_values for cell in row)
         except Exception:
             return False
     
@@ -150,81 +205,110 @@ class GoogleSheetsMenuParser:
         dates_by_worksheet = {}
         
         # Pour chaque date cible, déterminer l'onglet approprié
+        worksheets_by_title = {}
         for target_date in target_dates:
-            
+
             worksheet = self.determine_sheet_for_date(target_date)
             if not worksheet:
                 continue
-            
+
             # Grouper par titre d'onglet pour éviter les doublons
-            worksheet_title = worksheet.title
-            if worksheet_title not in dates_by_worksheet:
-                dates_by_worksheet[worksheet_title] = {
-                    'worksheet': worksheet,
-                    'dates': []
-                }
-            dates_by_worksheet[worksheet_title]['dates'].append(target_date)
-        
+            worksheets_by_title[worksheet.title] = worksheet
+            dates_by_worksheet.setdefault(worksheet.title, []).append(target_date)
+
+        if not dates_by_worksheet:
+            return menus
+
+        # Une seule requête HTTP pour tous les onglets nécessaires,
+        # limitée au bloc utile plutôt qu'à l'onglet entier
+        worksheet_titles = list(dates_by_worksheet.keys())
+        ranges = [f"{title}!A1:Z50" for title in worksheet_titles]
+        try:
+            value_ranges = self._get_spreadsheet().values_batch_get(ranges)['valueRanges']
+            values_by_title = {
+                # Valeurs de la plage (absentes si l'onglet est vide)
+                title: value_range.get('values', [])
+                for title, value_range in zip(worksheet_titles, value_ranges)
+            }
+        except Exception as e:
+            # Repli onglet par onglet: les lectures sont des appels réseau
+            # indépendants, on les fait en parallèle pour recouvrir la latence
+            print(f"❌ Erreur récupération des plages ({e}), repli onglet par onglet")
+
+            def fetch_values(title):
+                try:
+                    return self._get_values(worksheets_by_title[title])
+                except Exception:
+                    return []
+
+            with ThreadPoolExecutor(max_workers=len(worksheet_titles)) as executor:
+                values_by_title = dict(zip(
+                    worksheet_titles, executor.map(fetch_values, worksheet_titles)
+                ))
+
         # Traiter chaque onglet une seule fois
-        for worksheet_title, worksheet_data in dates_by_worksheet.items():
-            worksheet = worksheet_data['worksheet']
-            dates_for_this_sheet = worksheet_data['dates']
-            
+        for worksheet_title, all_values in values_by_title.items():
+            dates_for_this_sheet = dates_by_worksheet[worksheet_title]
+
             try:
-                # Récupérer toutes les valeurs de l'onglet UNE SEULE FOIS
-                all_values = worksheet.get_all_values()
-                
-                # Chercher toutes les dates de ce groupe dans l'onglet
-                for target_date in dates_for_this_sheet:
-                    date_key = target_date.strftime('%Y-%m-%d')
-                    target_date_str = target_date.strftime('%d/%m')
-                    
-                    # Parcourir les lignes pour trouver la date
-                    i = 0
-                    while i < len(all_values):
-                        row = all_values[i]
-                        
-                        # Vérifier si cette ligne contient des dates
-                        if len(row) > 1 and (row[0] == '' or not row[0].strip()):
-                            date_found_in_row = False
-                            
-                            # Parcourir les colonnes pour trouver notre date spécifique
-                            for col_idx, cell in enumerate(row[1:], 1):
-                                if cell and ' ' in cell:
-                                    parts = cell.strip().split(' ')
-                                    if len(parts) >= 2:
-                                        date_part = parts[-1]  # "30/06"
-                                        
-                                        if date_part == target_date_str:
-                                            date_found_in_row = True
-                                            
-                                            # Initialiser les menus pour cette date
-                                            menus[date_key] = {'midi': '', 'soir': ''}
-                                            
-                                            # Ligne suivante = Midi
-                                            if i + 1 < len(all_values):
-                                                midi_row = all_values[i + 1]
-                                                if (len(midi_row) > col_idx and 
-                                                    midi_row[0].strip().lower() == 'midi'):
-                                                    menus[date_key]['midi'] = midi_row[col_idx].strip()
-                                            
-                                            # Ligne encore suivante = Soir
-                                            if i + 2 < len(all_values):
-                                                soir_row = all_values[i + 2]
-                                                if (len(soir_row) > col_idx and 
-                                                    soir_row[0].strip().lower() == 'soir'):
-                                                    menus[date_key]['soir'] = soir_row[col_idx].strip()
-                                            
-                                            break  # Date trouvée, pas besoin de continuer cette ligne
-                            
-                            if date_found_in_row:
-                                break  # Date trouvée, pas besoin de continuer à chercher
-                            else:
-                                i += 1
-                        else:
-                            i += 1
-                                            
+
+                # Uniformiser la largeur une seule fois puis convertir en
+                # tableau NumPy: accès directs ensuite, sans garde de longueur
+                grid = np.array(_pad_rows(all_values), dtype=str)
+
+                # Espaces de fin retirés une fois par onglet: la recherche
+                # par date se fait ensuite entièrement en C, sans rappel
+                # Python par cellule
+                stripped = np.char.rstrip(grid) if grid.size else grid
+
+                # Dates restantes à trouver dans cet onglet ("30/06" -> clé)
+                remaining = {
+                    d.strftime('%d/%m'): d.strftime('%Y-%m-%d')
+                    for d in dates_for_this_sheet
+                }
+
+                if not grid.size or not remaining:
+                    continue
+
+                # Un seul masque couvrant toutes les dates de l'onglet
+                # (cellule "lundi 30/06" ou réduite à la date seule)
+                mask = np.zeros(grid.shape, dtype=bool)
+                for date_str in remaining:
+                    mask |= (np.char.endswith(stripped, ' ' + date_str)
+                             | (stripped == date_str))
+
+                for row_idx, col_idx in np.argwhere(mask):
+                    # Les dates sont dans les colonnes de données (pas la
+                    # colonne des libellés Midi/Soir)
+                    if col_idx == 0 or grid[row_idx, 0].strip():
+                        continue
+
+                    # Retrouver quelle date correspond à cette cellule
+                    date_key = remaining.pop(
+                        str(stripped[row_idx, col_idx]).rsplit(' ', 1)[-1], None
+                    )
+                    if date_key is None:
+                        continue  # date déjà traitée
+
+                    # Initialiser les menus pour cette date
+                    menus[date_key] = {'midi': '', 'soir': ''}
+
+                    # Ligne suivante = Midi
+                    if row_idx + 1 < grid.shape[0]:
+                        midi_row = grid[row_idx + 1]
+                        if midi_row[0].strip().lower() == 'midi':
+                            menus[date_key]['midi'] = midi_row[col_idx].strip()
+
+                    # Ligne encore suivante = Soir
+                    if row_idx + 2 < grid.shape[0]:
+                        soir_row = grid[row_idx + 2]
+                        if soir_row[0].strip().lower() == 'soir':
+                            menus[date_key]['soir'] = soir_row[col_idx].strip()
+
+                    if not remaining:
+                        break  # Toutes les dates trouvées, arrêt immédiat
+
             except Exception as e:
-                print(f"❌ Erreur récupération données pour l'onglet {worksheet.title}: {e}")
+                print(f"❌ Erreur récupération données pour l'onglet {worksheet_title}: {e}")
         
         return menus
@@ -8,49 +8,54 @@ import argparse
 import json
 import sys
 import os
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
 
 try:
-    from menu import GoogleSheetsMenuParser
-except ImportError as e:
-    print(json.dumps({"error": f"Failed to import menu module: {e}"}), file=sys.stderr)
-    sys.exit(1)
+    # orjson serializes in native code and emits UTF-8 bytes directly
+    import orjson
 
+    def _dumps_bytes(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    def _dumps_bytes(obj):
+        return json.dumps(obj, ensure_ascii=False).encode()
+
+@lru_cache(maxsize=32)
 def parse_date_string(date_str):
-    """Parse date string in DD/MM/YYYY format."""
+    """Parse date string in DD/MM or DD/MM/YYYY format (memoized)."""
     try:
-        parts = date_str.split('/')
-        if len(parts) == 2:
+        # Single strptime call (its format pattern is compiled and cached
+        # by the stdlib) instead of split + per-part int conversions
+        fmt = '%d/%m/%Y' if date_str.count('/') == 2 else '%d/%m'
+        parsed = datetime.strptime(date_str, fmt)
+        if fmt == '%d/%m':
             # DD/MM format, assume current year
-            day, month = int(parts[0]), int(parts[1])
-            year = datetime.now().year
-        elif len(parts) == 3:
-            # DD/MM/YYYY format
-            day, month, year = int(parts[0]), int(parts[1]), int(parts[2])
-        else:
-            raise ValueError("Invalid date format")
-        
-        return datetime(year, month, day)
-    except (ValueError, IndexError) as e:
+            parsed = parsed.replace(year=date.today().year)
+        return parsed
+    except ValueError as e:
         raise ValueError(f"Invalid date format '{date_str}'. Expected DD/MM or DD/MM/YYYY") from e
 
 def get_menu_data(spreadsheet_id, credentials_file, test_date=None):
     """Fetch menu data using GoogleSheetsMenuParser."""
+    # Deferred import: menu pulls in gspread/numpy, which is wasted work
+    # for --help or argument errors
+    try:
+        from menu import GoogleSheetsMenuParser
+    except ImportError as e:
+        raise RuntimeError(f"Failed to import menu module: {e}") from e
+
     try:
         parser = GoogleSheetsMenuParser(credentials_file, spreadsheet_id)
         
         if test_date:
             # Calculate today and tomorrow from test_date
-            from datetime import timedelta
             today = test_date
-            tomorrow = test_date + timedelta(days=1)
-            target_dates = [today, tomorrow]
         else:
-            # Use current date
-            from datetime import datetime, timedelta
-            today = datetime.now()
-            tomorrow = today + timedelta(days=1)
-            target_dates = [today, tomorrow]
+            # Current day at midnight (day granularity is all we need)
+            today = datetime.combine(date.today(), time.min)
+        tomorrow = today + timedelta(days=1)
+        target_dates = [today, tomorrow]
         
         # get_menus_for_dates expects a list of datetime objects
         raw_menus = parser.get_menus_for_dates(target_dates)
@@ -124,8 +129,10 @@ Examples:
             test_date
         )
         
-        # Output JSON to stdout (ensure_ascii=False for French characters)
-        print(json.dumps(menus, ensure_ascii=False))
+        # Output JSON bytes straight to stdout, skipping the intermediate
+        # str build and re-encode that print() would do
+        sys.stdout.buffer.write(_dumps_bytes(menus) + b'\n')
+        sys.stdout.buffer.flush()
     
     except Exception as e:
         # Output error to stderr and exit with non-zero code
@@ -133,7 +140,8 @@ Examples:
             "error": str(e),
             "success": False
         }
-        print(json.dumps(error_response), file=sys.stderr)
+        sys.stderr.buffer.write(_dumps_bytes(error_response) + b'\n')
+        sys.stderr.buffer.flush()
         sys.exit(1)
 
 
@@ -105,32 +105,54 @@ static int write_surface_as_bmp_no_rotate(cairo_surface_t *surface, const char *
     
     fwrite(bmp_header, 1, BMP_HEADER_SIZE, f);
     
-    // Write pixel data (no rotation, convert RGB24 to monochrome with Floyd-Steinberg dithering)
-    unsigned char *row_data = malloc(row_padded);
-    
+    // Write pixel data (no rotation, convert RGB24 to monochrome with threshold
+    // quantization). Assemble every row in memory and write the block with a
+    // single fwrite instead of one syscall per row.
+    unsigned char *pixel_data = calloc(pixel_data_size, 1);
+    if (!pixel_data) {
+        LOG_ERROR("❌ Failed to allocate pixel buffer");
+        fclose(f);
+        return 0;
+    }
+
     for (int y = height - 1; y >= 0; y--) {
-        memset(row_data, 0, row_padded);
+        // BMP is bottom-up: the first row emitted is the last image row
+        unsigned char *row_data = pixel_data + (height - 1 - y) * row_padded;
+        unsigned char packed = 0;
         for (int x = 0; x < width; x++) {
             int cairo_offset = y * stride + x * 4;
             unsigned char blue = data[cairo_offset];
             unsigned char green = data[cairo_offset + 1];
             unsigned char red = data[cairo_offset + 2];
-            
-            // Convert to grayscale and quantize with improved threshold
-            float gray = 0.299f * red + 0.587f * green + 0.114f * blue;
+
+            // Convert to grayscale with integer fixed-point luma (scaled by
+            // 1000) to keep floating point out of the per-pixel loop
+            int gray = 299 * red + 587 * green + 114 * blue;
             // Use a more conservative threshold to avoid antialiasing artifacts
-            int bit_value = (gray > 192) ? 1 : 0;
-            
-            int byte_index = x / 8;
-            int bit_index = 7 - (x % 8);
-            if (bit_value) {
-                row_data[byte_index] |= (1 << bit_index);
+            int bit_value = (gray > 192 * 1000) ? 1 : 0;
+
+            // Pack 8 pixels per byte in a register (MSB first), storing each
+            // completed byte instead of indexing row_data per pixel
+            packed = (unsigned char)((packed << 1) | bit_value);
+            if ((x & 7) == 7) {
+                row_data[x >> 3] = packed;
+                packed = 0;
             }
         }
-        fwrite(row_data, 1, row_padded, f);
+        // Flush trailing bits when the width is not a multiple of 8
+        if (width & 7) {
+            row_data[width >> 3] = (unsigned char)(packed << (8 - (width & 7)));
+        }
     }
-    
-    free(row_data);
+
+    if (fwrite(pixel_data, 1, pixel_data_size, f) != (size_t)pixel_data_size) {
+        LOG_ERROR("❌ Failed to write BMP pixel data");
+        free(pixel_data);
+        fclose(f);
+        return 0;
+    }
+
+    free(pixel_data);
     fclose(f);
     return 1;
 }
@@ -150,27 +172,30 @@ static int write_surface_as_bmp(cairo_surface_t *surface, const char *filename)
         return 0;
     }
     
-    // Calculate row padding for 1-bit bitmap (rows must be aligned to 4 bytes)
-    int bits_per_row = width;
-    int bytes_per_row = (bits_per_row + 7) / 8;  // Round up to nearest byte
-    int row_padded = (bytes_per_row + 3) & (~3); // Align to 4-byte boundary
-    int pixel_data_size = row_padded * height;
+    // The surface is rendered portrait (480x800) and rotated 90 degrees
+    // clockwise while writing, so size the header for the rotated image
+    // up front instead of writing it and patching it afterwards
+    int rotated_width = height;   // Rotated width = original height
+    int rotated_height = width;   // Rotated height = original width
+    int rotated_bytes_per_row = (rotated_width + 7) / 8;  // Round up to nearest byte
+    int rotated_row_padded = (rotated_bytes_per_row + 3) & (~3); // Align to 4-byte boundary
+    int pixel_data_size = rotated_row_padded * rotated_height;
     int file_size = BMP_HEADER_SIZE + pixel_data_size;
-    
+
     // Create BMP header with color table
     unsigned char bmp_header[BMP_HEADER_SIZE] = {0};
-    
+
     // BMP File Header (14 bytes)
     bmp_header[0] = 'B';
     bmp_header[1] = 'M';
     write_le32(bmp_header, 2, file_size);           // File size
     // Bytes 6-9: Reserved (already zeroed)
     write_le32(bmp_header, 10, BMP_HEADER_SIZE);    // Data offset (header + color table)
-    
+
     // BMP Info Header (40 bytes)
     write_le32(bmp_header, 14, 40);                 // Header size
-    write_le32(bmp_header, 18, width);              // Width
-    write_le32(bmp_header, 22, height);             // Height
+    write_le32(bmp_header, 18, rotated_width);      // Width
+    write_le32(bmp_header, 22, rotated_height);     // Height
     write_le16(bmp_header, 26, 1);                  // Planes
     write_le16(bmp_header, 28, BMP_BITS_PER_PIXEL); // Bits per pixel (1)
     write_le32(bmp_header, 30, 0);                  // Compression (none)
@@ -198,136 +223,109 @@ static int write_surface_as_bmp(cairo_surface_t *surface, const char *filename)
         return 0;
     }
     
-    // Allocate row buffer
-    unsigned char *row_data = malloc(row_padded);
-    if (!row_data) {
-        LOG_ERROR("❌ Failed to allocate row buffer");
+    // Assemble all pixel rows in memory and write the block with a single
+    // fwrite instead of one syscall per row
+    unsigned char *pixel_data = calloc(pixel_data_size, 1);
+    if (!pixel_data) {
+        LOG_ERROR("❌ Failed to allocate pixel buffer");
         fclose(f);
         return 0;
     }
-    
-    // Calculate rotated dimensions for buffer allocation
-    int rotated_width_for_buffer = height;   // Will be used for rotated image
-    
+
     // Create error diffusion buffer for dithering (sized for rotated image)
-    float *error_buffer = calloc(rotated_width_for_buffer + 2, sizeof(float)); // +2 for boundary handling
+    float *error_buffer = calloc(rotated_width + 2, sizeof(float)); // +2 for boundary handling
     if (!error_buffer) {
         LOG_ERROR("❌ Failed to allocate error buffer for dithering");
-        free(row_data);
+        free(pixel_data);
         fclose(f);
         return 0;
     }
-    
+
     // Write pixel data (BMP is bottom-up, 1-bit packed format with Floyd-Steinberg dithering)
     // Rotate image 90° clockwise to convert portrait (480x800) to landscape (800x480)
-    int rotated_width = height;   // Rotated width = original height
-    int rotated_height = width;   // Rotated height = original width
-    int rotated_bytes_per_row = (rotated_width + 7) / 8;
-    int rotated_row_padded = (rotated_bytes_per_row + 3) & (~3);
-    
-    // Update file size for rotated dimensions
-    fseek(f, 2, SEEK_SET);
-    int rotated_pixel_data_size = rotated_row_padded * rotated_height;
-    int rotated_file_size = BMP_HEADER_SIZE + rotated_pixel_data_size;
-    write_le32((unsigned char*)&rotated_file_size, 0, rotated_file_size);
-    fwrite(&rotated_file_size, 4, 1, f);
-    
-    // Update width/height in header
-    fseek(f, 18, SEEK_SET);
-    write_le32((unsigned char*)&rotated_width, 0, rotated_width);
-    fwrite(&rotated_width, 4, 1, f);
-    write_le32((unsigned char*)&rotated_height, 0, rotated_height);
-    fwrite(&rotated_height, 4, 1, f);
-    
-    // Update image size in header
-    fseek(f, 34, SEEK_SET);
-    write_le32((unsigned char*)&rotated_pixel_data_size, 0, rotated_pixel_data_size);
-    fwrite(&rotated_pixel_data_size, 4, 1, f);
-    
-    // Seek back to data section
-    fseek(f, BMP_HEADER_SIZE, SEEK_SET);
-    
-    // Reallocate row buffer for rotated dimensions
-    free(row_data);
-    row_data = malloc(rotated_row_padded);
-    if (!row_data) {
-        LOG_ERROR("❌ Failed to allocate rotated row buffer");
-        free(error_buffer);
-        fclose(f);
-        return 0;
-    }
-    
-    // Write rotated pixel data (BMP is bottom-up)
     for (int y = rotated_height - 1; y >= 0; y--) {
-        // Clear row buffer
-        memset(row_data, 0, rotated_row_padded);
-        
+        // BMP is bottom-up: the first row emitted is the last image row
+        unsigned char *row_data = pixel_data + (rotated_height - 1 - y) * rotated_row_padded;
+
         // Reset error buffer for new row (only reset current and next pixel)
         for (int i = 0; i < rotated_width + 2; i++) {
             error_buffer[i] = 0.0f;
         }
         
         // Convert rotated coordinates back to original image coordinates
+        unsigned char packed = 0;
         for (int x = 0; x < rotated_width; x++) {
             // Rotation mapping: rotated(x,y) = original(original_width-1-y, x)
             int orig_x = width - 1 - y;   // Original x from rotated y
             int orig_y = x;               // Original y from rotated x
-            
-            // Skip if outside original bounds
-            if (orig_x < 0 || orig_x >= width || orig_y < 0 || orig_y >= height) {
-                continue;
-            }
-            
-            int cairo_offset = orig_y * stride + orig_x * 4;
-            
-            // Get RGB values from Cairo ARGB32 format: B-G-R-A
-            unsigned char blue = data[cairo_offset];
-            unsigned char green = data[cairo_offset + 1];
-            unsigned char red = data[cairo_offset + 2];
-            
-            // Convert to grayscale using standard weights
-            float gray = 0.299f * red + 0.587f * green + 0.114f * blue;
-            
-            // Apply accumulated error from previous pixels
-            gray += error_buffer[x + 1]; // +1 for boundary offset
-            
-            // Clamp to valid range
-            if (gray < 0) gray = 0;
-            if (gray > 255) gray = 255;
-            
-            // Quantize: > 128 = white (255), <= 128 = black (0)
-            int quantized = (gray > 128) ? 255 : 0;
-            int bit_value = (quantized > 0) ? 1 : 0;
-            
-            // Calculate quantization error
-            float error = gray - quantized;
-            
-            // Distribute error to neighboring pixels (Floyd-Steinberg pattern)
-            if (x + 1 < rotated_width) {
-                error_buffer[x + 2] += error * 7.0f / 16.0f; // Right pixel
+
+            int bit_value = 0;
+
+            // Pixels outside the original bounds stay 0
+            if (orig_x >= 0 && orig_x < width && orig_y >= 0 && orig_y < height) {
+                int cairo_offset = orig_y * stride + orig_x * 4;
+
+                // Get RGB values from Cairo ARGB32 format: B-G-R-A
+                unsigned char blue = data[cairo_offset];
+                unsigned char green = data[cairo_offset + 1];
+                unsigned char red = data[cairo_offset + 2];
+
+                float err_in = error_buffer[x + 1]; // +1 for boundary offset
+
+                // Fast path: the renderer emits mostly pure black/white pixels;
+                // with no accumulated error they quantize exactly and produce no
+                // error to diffuse, so the dithering arithmetic can be skipped
+                if (err_in == 0.0f && ((red & green & blue) == 255 || (red | green | blue) == 0)) {
+                    bit_value = red ? 1 : 0;
+                } else {
+                    // Convert to grayscale using standard weights
+                    float gray = 0.299f * red + 0.587f * green + 0.114f * blue;
+
+                    // Apply accumulated error from previous pixels
+                    gray += err_in;
+
+                    // Clamp to valid range
+                    if (gray < 0) gray = 0;
+                    if (gray > 255) gray = 255;
+
+                    // Quantize: > 128 = white (255), <= 128 = black (0)
+                    int quantized = (gray > 128) ? 255 : 0;
+                    bit_value = (quantized > 0) ? 1 : 0;
+
+                    // Calculate quantization error
+                    float error = gray - quantized;
+
+                    // Distribute error to neighboring pixels (Floyd-Steinberg pattern)
+                    if (x + 1 < rotated_width) {
+                        error_buffer[x + 2] += error * 7.0f / 16.0f; // Right pixel
+                    }
+                }
             }
-            
-            // Pack into bit array (MSB first)
-            int byte_index = x / 8;
-            int bit_index = 7 - (x % 8);
-            
-            if (bit_value) {
-                row_data[byte_index] |= (1 << bit_index);
+
+            // Pack 8 pixels per byte in a register (MSB first), storing each
+            // completed byte instead of indexing row_data per pixel
+            packed = (unsigned char)((packed << 1) | bit_value);
+            if ((x & 7) == 7) {
+                row_data[x >> 3] = packed;
+                packed = 0;
             }
         }
-        
-        if (fwrite(row_data, 1, rotated_row_padded, f) != (size_t)rotated_row_padded) {
-            LOG_ERROR("❌ Failed to write BMP row data");
-            free(error_buffer);
-            free(row_data);
-            fclose(f);
-            return 0;
+        // Flush trailing bits when the width is not a multiple of 8
+        if (rotated_width & 7) {
+            row_data[rotated_width >> 3] = (unsigned char)(packed << (8 - (rotated_width & 7)));
         }
     }
-    
+
     free(error_buffer);
-    
-    free(row_data);
+
+    if (fwrite(pixel_data, 1, pixel_data_size, f) != (size_t)pixel_data_size) {
+        LOG_ERROR("❌ Failed to write BMP pixel data");
+        free(pixel_data);
+        fclose(f);
+        return 0;
+    }
+
+    free(pixel_data);
     fclose(f);
     return 1;
 }